@@ -0,0 +1,142 @@
+# latex-backend/bench_latex.py
+"""
+Micro-benchmark for LaTeX escaping and the pre-compile validator on large resumes.
+
+Also checks that validate_tex accepts text the templates are known to compile.
+
+Compares the legacy chained str.replace escaper (one call per filter use)
+with the current escaper (fast path plus placeholder replace chain), both per
+filter call and applied once to the structured-data tree, then times
+validate_tex on the rendered source.
+
+Example:
+    python bench_latex.py --entries 40 --bullets 10 --repeat 20 --text plain
+"""
+
+import argparse
+import time
+
+import render
+from latex_safety import escape_latex, escape_tree, validate_tex
+from template_mapping import map_canonical_to_template
+
+_LEGACY_REPL = {
+    '\\': r'\textbackslash{}', '&': r'\&', '%': r'\%', '$': r'\$',
+    '#': r'\#', '_': r'\_', '{': r'\{', '}': r'\}', '~': r'\textasciitilde{}',
+    '^': r'\^{}',
+}
+
+
+def legacy_escape_latex(s):
+    """The previous ten-pass implementation, kept here for comparison only."""
+    if not s:
+        return ""
+    for k, v in _LEGACY_REPL.items():
+        s = s.replace(k, v)
+    return s
+
+
+TEXTS = {
+    # every bullet hits several specials: worst case for any escaper
+    "special": "Cut p99 latency 40% for R&D's C# service (~$2M/yr), owning {design} & on-call_rotation",
+    # typical resume prose
+    "plain": "Cut p99 latency by 40 percent for the payments service, owning design and on-call",
+}
+
+# Typeset fine with [T1]{fontenc} + [utf8]{inputenc}; validate_tex must not reject them
+COMPILABLE_SAMPLES = [
+    "\u0218tefan",   # Romanian S with comma below
+    "\u25e6 item",   # \textopenbullet
+    "\u2116 42",     # \textnumero
+    "\u0192 stop",   # \textflorin
+    "caf\u00e9 \u2013 na\u00efve \u201cquoted\u201d \u20ac5",
+]
+
+
+def check_compilable_samples():
+    env = render._env
+    template = env.get_template(render.TEMPLATE_MAP["simple"])
+    for sample in COMPILABLE_SAMPLES:
+        tex = template.render(**escape_tree({"name": sample, "summary": sample}))
+        problems = validate_tex(tex)
+        if problems:
+            raise SystemExit(f"validate_tex rejected compilable text {sample!r}: {problems}")
+    print(f"validate_tex accepts all {len(COMPILABLE_SAMPLES)} compilable samples")
+
+
+def make_canonical(entries: int, bullets: int, text: str) -> dict:
+    return {
+        "name": "Bench Mark",
+        "email": "bench_mark@example.com",
+        "phone": "+1 555 0100",
+        "headline": "Staff Engineer",
+        "summary": text,
+        "education": [
+            {"school": f"University {i}", "location": "City", "degree": "M.Sc. CS",
+             "dates": "2010 -- 2012", "notes": [text] * 2}
+            for i in range(max(1, entries // 8))
+        ],
+        "experience": [
+            {"title": "Engineer", "company": f"Company {i}", "location": "City",
+             "dates": "2019 -- 2021", "details": [text] * bullets}
+            for i in range(entries)
+        ],
+        "projects": [
+            {"name": f"Project {i}", "stack": "C#, C++, R&D", "dates": "2020", "details": [text] * bullets}
+            for i in range(entries)
+        ],
+        "awards": [{"title": text, "detail": text, "date": "2020"} for _ in range(entries // 4)],
+        "skills": [{"category": "Languages", "items": "C#, C++, F#, Python_3"}] * 4,
+        "services": [{"label": "Reviewer", "detail": text}] * 4,
+        "certifications": [{"name": text, "issuer": "Issuer", "dates": "2021"}] * 4,
+    }
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--entries", type=int, default=40, help="experience/project entries")
+    ap.add_argument("--bullets", type=int, default=10, help="bullets per entry")
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--text", choices=sorted(TEXTS), default="special")
+    args = ap.parse_args(argv)
+
+    check_compilable_samples()
+    canonical = make_canonical(args.entries, args.bullets, TEXTS[args.text])
+    env = render._env
+    print(f"{args.entries} entries x {args.bullets} bullets, {args.text} text, best of {args.repeat} (ms)")
+    print(f"{'template':>9} {'legacy filter':>14} {'escape filter':>14} {'tree escape':>12} {'validate':>9} {'tex KB':>7}")
+
+    for template_id, filename in render.TEMPLATE_MAP.items():
+        structured = map_canonical_to_template(canonical, template_id)
+        template = env.get_template(filename)
+
+        def with_filter(fn):
+            env.filters["escapelatex"] = fn
+            try:
+                return template.render(**structured)
+            finally:
+                env.filters["escapelatex"] = escape_latex
+
+        legacy = _best_of(lambda: with_filter(legacy_escape_latex), args.repeat)
+        single = _best_of(lambda: with_filter(escape_latex), args.repeat)
+        tree = _best_of(lambda: template.render(**escape_tree(structured)), args.repeat)
+        tex = template.render(**escape_tree(structured))
+        check = _best_of(lambda: validate_tex(tex), args.repeat)
+        print(f"{template_id:>9} {legacy:>14.2f} {single:>14.2f} {tree:>12.2f} {check:>9.2f} {len(tex) / 1024:>7.1f}")
+
+    sample = r"C:\path {x}"
+    print(f"\nlegacy:  {legacy_escape_latex(sample)}")
+    print(f"current: {escape_latex(sample)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# latex-backend/latex_safety.py
+
+import re
+from typing import Any, List
+
+# ------------ Escaping ------------
+
+_LATEX_ESCAPES = {
+    '\\': r'\textbackslash{}', '&': r'\&', '%': r'\%', '$': r'\$',
+    '#': r'\#', '_': r'\_', '{': r'\{', '}': r'\}', '~': r'\textasciitilde{}',
+    '^': r'\^{}',
+}
+# str.replace chain with no per-match Python callback. Backslashes are parked on
+# a NUL placeholder and restored last, so the braces in \textbackslash{} are never
+# re-escaped; braces go before ~ and ^ for the same reason.
+_BACKSLASH_PLACEHOLDER = "\x00"
+_REPLACE_ORDER = tuple((ch, _LATEX_ESCAPES[ch]) for ch in "&%$#_{}~^")
+# Strings without specials skip the chain
+_LATEX_SPECIAL = re.compile(r"[\\&%$#_{}~^]")
+
+
+def _escape(s: str) -> str:
+    if not _LATEX_SPECIAL.search(s):
+        return s
+    # NUL cannot be typeset anyway; dropped so it can serve as the placeholder
+    s = s.replace(_BACKSLASH_PLACEHOLDER, "").replace("\\", _BACKSLASH_PLACEHOLDER)
+    for ch, repl in _REPLACE_ORDER:
+        s = s.replace(ch, repl)
+    return s.replace(_BACKSLASH_PLACEHOLDER, _LATEX_ESCAPES["\\"])
+
+# Rendered unescaped inside \url{...} by the templates
+_VERBATIM_KEYS = frozenset({"website"})
+# Looped over by the templates; a plain string here would be iterated per character
+_LIST_KEYS = frozenset({"details", "bullets", "tasks", "points", "notes", "tech"})
+
+
+class LatexSafe(str):
+    """A string that has already been LaTeX-escaped; the filter passes it through."""
+    __slots__ = ()
+
+
+def escape_latex(s: Any) -> str:
+    if not s:
+        return ""
+    if isinstance(s, LatexSafe):
+        return s
+    return _escape(str(s))
+
+
+def escape_tree(data: Any, _key: str = None) -> Any:
+    """
+    Escape every string in a structured-data tree once, up front, so the
+    `escapelatex` filter is a no-op at render time. Strings under list keys
+    (e.g. an LLM returning `details` as text) become one item per line.
+    """
+    if isinstance(data, LatexSafe):
+        return data
+    if isinstance(data, str):
+        if _key in _VERBATIM_KEYS:
+            return data
+        if _key in _LIST_KEYS:
+            return [LatexSafe(_escape(line.strip())) for line in data.splitlines() if line.strip()]
+        return LatexSafe(_escape(data))
+    if isinstance(data, dict):
+        return {k: escape_tree(v, k) for k, v in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [escape_tree(v, _key) for v in data]
+    return data
+
+# ------------ Pre-compile validation ------------
+
+# Block only what T1/TS1 + utf8 inputenc can never map: control characters and
+# whole scripts/symbol planes without declarations (Greek, Cyrillic, RTL and Indic
+# scripts, CJK, Hangul, fullwidth forms, emoji, variation selectors, private use).
+# Latin, punctuation and TS1 symbols (U+0218, U+25E6, U+2116, U+0192, ...) pass;
+# a stray unmapped symbol there is left to pdflatex's own error.
+_UNSUPPORTED_CHAR = re.compile(
+    "[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f"
+    "\u0370-\u03ff\u0400-\u052f\u0530-\u1dbf\u1f00-\u1fff"
+    "\u2e80-\ua4cf\uac00-\ud7ff\ue000-\uf8ff\uf900-\ufaff"
+    "\ufe00-\ufe0f\ufe30-\ufe4f\uff00-\uffef\U00010000-\U0010ffff]"
+)
+_MATH_OPEN = {"$": "$", r"\(": r"\)", r"\[": r"\]"}
+# Environments in which an unescaped & is an alignment tab
+_ALIGN_ENVS = re.compile(r"^(tabular\*?|tabularx|array|align\*?|alignat\*?|matrix|[pbvBV]matrix)$")
+# Macros whose (first) argument is read verbatim-ish
+_VERBATIM_ARG_MACROS = frozenset({r"\url", r"\href"})
+
+_TOKEN = re.compile(
+    r"\\(?:begin|end)\s*\{([^{}]*)\}"   # environment boundary (group 1 = name)
+    r"|\\(?:[A-Za-z@]+|.)"              # control word / control symbol
+    r"|%[^\n]*"                         # comment
+    r"|[{}$&#^_]",                      # specials we track
+    flags=re.S,
+)
+MAX_REPORTED_PROBLEMS = 10
+
+
+def _skip_group(tex: str, pos: int) -> int:
+    """If a {...} group starts at pos (after whitespace), return the index past it."""
+    i = pos
+    while i < len(tex) and tex[i] in " \t":
+        i += 1
+    if i >= len(tex) or tex[i] != "{":
+        return pos
+    depth = 0
+    while i < len(tex):
+        ch = tex[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return pos
+
+
+def validate_tex(tex: str) -> List[str]:
+    """
+    Cheap structural check of a rendered .tex before spawning pdflatex.
+    Returns human-readable problems (empty list = looks compilable):
+    unbalanced braces, stray #/&/_/^ in body text, unclosed math, and
+    characters utf8 inputenc cannot typeset.
+    """
+    problems: List[str] = []
+
+    def report(offset: int, msg: str):
+        if len(problems) < MAX_REPORTED_PROBLEMS:
+            line_no = tex.count("\n", 0, offset) + 1
+            problems.append(f"line {line_no}: {msg}")
+
+    for m in _UNSUPPORTED_CHAR.finditer(tex):
+        report(m.start(), f"character U+{ord(m.group(0)):04X} is not supported by inputenc")
+        if len(problems) >= MAX_REPORTED_PROBLEMS:
+            break
+
+    body_start = tex.find("\\begin{document}")
+    depth = 0
+    envs: List[str] = []
+    math_close = None
+    pos = 0
+    while True:
+        m = _TOKEN.search(tex, pos)
+        if not m:
+            break
+        tok = m.group(0)
+        at = m.start()
+        pos = m.end()
+        in_body = body_start != -1 and at > body_start
+
+        if tok.startswith("%"):
+            pass
+        elif m.group(1) is not None:
+            name = m.group(1).strip()
+            # Only tracked for the & check; list macros may split begin/end across definitions
+            if tok.startswith("\\begin"):
+                envs.append(name)
+            elif name in envs:
+                del envs[len(envs) - 1 - envs[::-1].index(name):]
+        elif tok == "{":
+            depth += 1
+        elif tok == "}":
+            depth -= 1
+            if depth < 0:
+                report(at, "unbalanced '}'")
+                depth = 0
+        elif math_close is not None:
+            if tok == math_close:
+                math_close = None
+        elif tok in _MATH_OPEN:
+            math_close = _MATH_OPEN[tok]
+        elif tok in _VERBATIM_ARG_MACROS:
+            pos = _skip_group(tex, pos)
+        elif not in_body:
+            pass
+        elif tok == "#":
+            report(at, "stray '#' in document body")
+        elif tok in ("_", "^"):
+            report(at, f"'{tok}' outside math mode")
+        elif tok == "&" and not any(_ALIGN_ENVS.match(e) for e in envs):
+            report(at, "stray '&' outside an alignment environment")
+
+    if depth > 0:
+        report(len(tex), f"{depth} unclosed '{{'")
+    if math_close is not None:
+        report(len(tex), "math mode is never closed")
+    return problems
@@ -8,7 +8,10 @@ from typing import Dict, Any
 
 # ------------ Config ------------
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")  # set in your shell
-OPENROUTER_ENDPOINT = "https://openrouter.ai/api/v1/chat/completions"
+# Overridable so load tests can point the backend at a local fake LLM
+OPENROUTER_ENDPOINT = os.getenv(
+    "OPENROUTER_ENDPOINT", "https://openrouter.ai/api/v1/chat/completions"
+)
 DEFAULT_MODEL = "meta-llama/llama-3.1-8b-instruct"
 TIMEOUT_SECS = 60
 
@@ -0,0 +1,384 @@
+# latex-backend/load_test.py
+"""
+End-to-end load test for the render API.
+
+Starts a local fake OpenRouter server, boots the real app under uvicorn
+(pointed at the fake via OPENROUTER_ENDPOINT) and drives POST /render with
+real pdflatex compiles. For every payload size x concurrency level it records
+throughput, latency percentiles, error rate, server thread/process counts and
+peak RSS of the server process tree, then prints a saturation curve.
+
+Example:
+    python load_test.py --concurrency 1,2,4,8,16 --sizes small,large --workers 2 --csv out.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# entries per section, bullets per entry
+PAYLOAD_SIZES = {
+    "small": (1, 2),
+    "medium": (3, 4),
+    "large": (6, 8),
+}
+
+_CLEANER_MARKER = "Original Resume JSON (keys to preserve):"
+_RAW_MARKER = "Raw Resume Data (may be flat strings):"
+_SCHEMA_MARKER = "Schema (shape to match exactly):"
+
+_LOREM = (
+    "Delivered measurable improvements across services, owning design, "
+    "rollout and on-call for a team of engineers"
+)
+
+# ------------ Fake LLM ------------
+
+def _fake_instance(hint, n_items: int):
+    """Build a plausible value shaped like a schema hint."""
+    if isinstance(hint, dict):
+        return {k: _fake_instance(v, n_items) for k, v in hint.items()}
+    if isinstance(hint, list):
+        if not hint:
+            return []
+        return [_fake_instance(hint[0], n_items) for _ in range(n_items)]
+    return _LOREM[: 20 + 7 * n_items]
+
+
+def _fake_completion(prompt: str) -> str:
+    # Stage 1 (llm_cleaner): echo the input JSON back unchanged
+    if _CLEANER_MARKER in prompt:
+        return prompt.split(_CLEANER_MARKER, 1)[1].strip()
+
+    # Stage 2 (structuring): fill the requested schema, sized by the raw data
+    if _SCHEMA_MARKER in prompt:
+        head, schema_text = prompt.split(_SCHEMA_MARKER, 1)
+        raw = head.split(_RAW_MARKER, 1)[-1]
+        n_items = max(1, min(12, len(raw) // 800))
+        try:
+            schema = json.loads(schema_text)
+        except ValueError:
+            schema = {"name": "string"}
+        return json.dumps(_fake_instance(schema, n_items))
+
+    return "{}"
+
+
+def start_fake_llm(port: int, latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            prompt = "\n".join(m.get("content", "") for m in body.get("messages", []))
+            time.sleep(latency)
+            out = json.dumps({"choices": [{"message": {"content": _fake_completion(prompt)}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# ------------ Server process sampling ------------
+
+def _proc_tree(pid: int):
+    """pid plus all descendants, via /proc (Linux)."""
+    pids, stack = [], [pid]
+    while stack:
+        p = stack.pop()
+        pids.append(p)
+        try:
+            for task in os.listdir(f"/proc/{p}/task"):
+                with open(f"/proc/{p}/task/{task}/children") as f:
+                    stack.extend(int(c) for c in f.read().split())
+        except OSError:
+            pass
+    return pids
+
+
+def _proc_status(pid: int):
+    """(rss_kb, threads) from /proc/<pid>/status, or (0, 0) if it exited."""
+    rss = threads = 0
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1])
+                elif line.startswith("Threads:"):
+                    threads = int(line.split()[1])
+    except OSError:
+        pass
+    return rss, threads
+
+
+class ResourceSampler:
+    """Polls the server process tree and keeps the peaks seen since reset()."""
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.enabled = os.path.isdir(f"/proc/{pid}")
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.peak_rss_kb = 0
+            self.peak_threads = 0
+            self.peak_procs = 0
+
+    def _sample(self):
+        pids = _proc_tree(self.pid)
+        rss = threads = 0
+        for p in pids:
+            r, t = _proc_status(p)
+            rss += r
+            threads += t
+        with self._lock:
+            self.peak_rss_kb = max(self.peak_rss_kb, rss)
+            self.peak_threads = max(self.peak_threads, threads)
+            self.peak_procs = max(self.peak_procs, len(pids))
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self.enabled:
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+# ------------ Load generation ------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def make_payload(size: str, seq: int, template_id: str, max_pages=None) -> dict:
+    entries, bullets = PAYLOAD_SIZES[size]
+
+    def block(label):
+        return "\n\n".join(
+            f"{label} {i} | Company {i} | City | 2019 - 2021\n"
+            + "\n".join(f"• {_LOREM} ({label.lower()} {i}.{j})" for j in range(bullets))
+            for i in range(entries)
+        )
+
+    req = {
+        "templateId": template_id,
+        "jobDescription": "Senior engineer. Python, distributed systems, LaTeX.",
+        "resumeData": {
+            # Unique name per request so the render cache never short-circuits a compile
+            "name": f"Load Test {seq}",
+            "email": "load@test.dev",
+            "phone": "+1 555 0100",
+            "experience": block("Engineer"),
+            "projects": block("Project"),
+            "education": block("Degree"),
+            "skills": "Languages: Python, C++\nTools: Docker, Git",
+            "certifications": "Cert A | Issuer | 2020",
+        },
+    }
+    if max_pages:
+        req["maxPages"] = max_pages
+    return req
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = (len(values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def run_level(base_url: str, size: str, concurrency: int, n_requests: int, template_id: str,
+              max_pages, sampler: ResourceSampler, seq_start: int, timeout: float) -> dict:
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def one(seq):
+        nonlocal errors
+        payload = make_payload(size, seq, template_id, max_pages)
+        t0 = time.perf_counter()
+        try:
+            r = requests.post(f"{base_url}/render", json=payload, timeout=timeout)
+            ok = r.status_code == 200 and r.headers.get("content-type", "").startswith("application/pdf")
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - t0
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    sampler.reset()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(seq_start, seq_start + n_requests)))
+    wall = time.perf_counter() - t0
+
+    return {
+        "size": size,
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "ok": len(latencies),
+        "error_rate": round(errors / n_requests, 4),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p90_ms": round(_percentile(latencies, 90) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(max(latencies, default=0) * 1000, 1),
+        "peak_threads": sampler.peak_threads if sampler.enabled else None,
+        "peak_procs": sampler.peak_procs if sampler.enabled else None,
+        "peak_rss_mb": round(sampler.peak_rss_kb / 1024, 1) if sampler.enabled else None,
+    }
+
+# ------------ Reporting ------------
+
+def print_table(rows):
+    cols = ["size", "concurrency", "ok", "error_rate", "throughput_rps", "p50_ms", "p90_ms",
+            "p99_ms", "peak_threads", "peak_procs", "peak_rss_mb"]
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in cols}
+    print("  ".join(c.rjust(widths[c]) for c in cols))
+    for r in rows:
+        print("  ".join(str(r[c]).rjust(widths[c]) for c in cols))
+
+
+def print_saturation(rows, width: int = 40):
+    """ASCII throughput-vs-concurrency curve per payload size, with the knee marked."""
+    for size in dict.fromkeys(r["size"] for r in rows):
+        level = [r for r in rows if r["size"] == size]
+        top = max((r["throughput_rps"] for r in level), default=0) or 1
+        knee = saturation_point(level)
+        print(f"\nSaturation curve [{size}] (throughput rps | p90 ms)")
+        if knee is None:
+            print("  (throughput still rising at the highest level; extend --concurrency)")
+        for r in level:
+            bar = "#" * int(round(width * r["throughput_rps"] / top))
+            mark = "  <- saturation" if r["concurrency"] == knee else ""
+            print(f"  c={r['concurrency']:>4} {bar.ljust(width)} {r['throughput_rps']:>8} | {r['p90_ms']}{mark}")
+
+
+def saturation_point(level, gain: float = 0.05):
+    """First concurrency after which throughput improves by less than `gain` (None if it never flattens)."""
+    for prev, cur in zip(level, level[1:]):
+        if prev["throughput_rps"] and cur["throughput_rps"] < prev["throughput_rps"] * (1 + gain):
+            return prev["concurrency"]
+    return None
+
+# ------------ Main ------------
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--concurrency", default="1,2,4,8", help="comma separated concurrency levels")
+    ap.add_argument("--sizes", default="small,medium,large", help=f"subset of {','.join(PAYLOAD_SIZES)}")
+    ap.add_argument("--requests", type=int, default=16, help="requests per level (at least 2x concurrency)")
+    ap.add_argument("--template", default="simple")
+    ap.add_argument("--max-pages", type=int, default=None, help="exercise the fit-to-pages path")
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    ap.add_argument("--llm-latency", type=float, default=0.2, help="seconds per fake LLM call")
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--csv", help="write results to this CSV file")
+    ap.add_argument("--json", help="write results to this JSON file")
+    args = ap.parse_args(argv)
+
+    if not shutil.which("pdflatex"):
+        sys.exit("pdflatex not found on PATH; the load test compiles real PDFs.")
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in PAYLOAD_SIZES]
+    if unknown:
+        sys.exit(f"Unknown payload size(s): {', '.join(unknown)}")
+
+    llm_port, app_port = _free_port(), _free_port()
+    llm = start_fake_llm(llm_port, args.llm_latency)
+    env = dict(
+        os.environ,
+        OPENROUTER_API_KEY="load-test",
+        OPENROUTER_ENDPOINT=f"http://127.0.0.1:{llm_port}/chat/completions",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(app_port), "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{app_port}"
+    sampler = ResourceSampler(server.pid)
+    rows = []
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                if requests.get(f"{base_url}/health", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                pass
+            if server.poll() is not None or time.time() > deadline:
+                sys.exit("uvicorn did not come up")
+            time.sleep(0.2)
+
+        sampler.start()
+        seq = 0
+        for size in sizes:
+            for c in levels:
+                n = max(args.requests, 2 * c)
+                row = run_level(base_url, size, c, n, args.template, args.max_pages,
+                                sampler, seq, args.timeout)
+                seq += n
+                rows.append(row)
+                print(f"[{size} c={c}] {row['throughput_rps']} rps, p90 {row['p90_ms']} ms, "
+                      f"errors {row['error_rate']:.0%}, peak RSS {row['peak_rss_mb']} MB", flush=True)
+    finally:
+        sampler.stop()
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        llm.shutdown()
+
+    print()
+    print_table(rows)
+    print_saturation(rows)
+
+    if args.csv and rows:
+        with open(args.csv, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=list(rows[0]))
+            w.writeheader()
+            w.writerows(rows)
+    if args.json and rows:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,40 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
-from render import render_pdf
+from starlette.background import BackgroundTask
+from render import render_pdf, render_pdfs, build_zip, release_pdf, clear_pdf_cache, TEMPLATE_MAP
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # uvicorn re-raises SIGTERM after shutdown, so atexit hooks may never run
+    clear_pdf_cache()
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],  # frontend dev origin
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Compile-Count", "X-Page-Count", "X-Fits", "X-Linespread", "X-Trimmed-Bullets"],
 )
 
 class RenderRequest(BaseModel):
     templateId: str = "simple"
     resumeData: dict
+    jobDescription: str = ""
+    maxPages: Optional[int] = None  # fit layout to this many pages
+
+
+class MultiRenderRequest(BaseModel):
+    templateIds: List[str] = list(TEMPLATE_MAP)
+    resumeData: dict
+    jobDescription: str = ""
+    maxPages: Optional[int] = None
 
 
 @app.post("/render")
@@ -23,12 +43,62 @@ def render_endpoint(req: RenderRequest):
         print("Received templateId:", req.templateId)
         print("Received resume keys:", list(req.resumeData.keys()))
 
-        pdf_bytes = render_pdf(req.resumeData, req.templateId)
-        return Response(
-            content=pdf_bytes,
+        payload = {"resumeData": req.resumeData, "jobDescription": req.jobDescription}
+        stats = {}
+        pdf_path = render_pdf(payload, req.templateId, max_pages=req.maxPages, stats=stats)
+        print("Render stats:", stats)
+
+        headers = {"X-Compile-Count": str(stats.get("compiles", 0))}
+        if "pages" in stats:
+            headers["X-Page-Count"] = str(stats["pages"])
+        if "fits" in stats:
+            headers["X-Fits"] = "true" if stats["fits"] else "false"
+        if "linespread" in stats:
+            headers["X-Linespread"] = str(stats["linespread"])
+        if "trimmed_bullets" in stats:
+            headers["X-Trimmed-Bullets"] = str(stats["trimmed_bullets"])
+        # Streamed from the compile workspace in chunks; removed once the send completes
+        return FileResponse(
+            pdf_path,
             media_type="application/pdf",
-            headers={"Content-Disposition": 'attachment; filename="resume.pdf"'}
+            filename="resume.pdf",
+            headers=headers,
+            background=BackgroundTask(release_pdf, pdf_path),
+        )
+    except HTTPException as e:
+        print(f"❌ HTTP {e.status_code}:", e.detail)
+        return JSONResponse(status_code=e.status_code, content={"error": e.detail})
+    except ValueError as e:
+        print("❌ ValueError:", str(e))
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    except Exception as e:
+        print("❌ Internal error:", str(e))
+        return JSONResponse(status_code=500, content={"error": "Internal server error"})
+
+@app.post("/render/multi")
+def render_multi_endpoint(req: MultiRenderRequest):
+    try:
+        print("Received templateIds:", req.templateIds)
+        print("Received resume keys:", list(req.resumeData.keys()))
+
+        payload = {"resumeData": req.resumeData, "jobDescription": req.jobDescription}
+        stats = {}
+        pdfs = render_pdfs(payload, req.templateIds, max_pages=req.maxPages, stats=stats)
+        print("Render stats:", stats)
+
+        # Built on disk next to the PDFs rather than in memory; per-template stats go in manifest.json
+        zip_path = build_zip(pdfs, stats)
+        headers = {"X-Compile-Count": str(sum(s.get("compiles", 0) for s in stats.values()))}
+        return FileResponse(
+            zip_path,
+            media_type="application/zip",
+            filename="resumes.zip",
+            headers=headers,
+            background=BackgroundTask(release_pdf, zip_path),
         )
+    except HTTPException as e:
+        print(f"❌ HTTP {e.status_code}:", e.detail)
+        return JSONResponse(status_code=e.status_code, content={"error": e.detail})
     except ValueError as e:
         print("❌ ValueError:", str(e))
         return JSONResponse(status_code=400, content={"error": str(e)})
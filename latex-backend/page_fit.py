@@ -0,0 +1,141 @@
+# latex-backend/page_fit.py
+
+import copy
+import math
+import re
+from typing import Dict, Any, Optional, Tuple
+
+# ------------ Config ------------
+
+# Tightest line spread we apply (relative to the template's own stretch)
+# before falling back to trimming bullets.
+LINESPREAD_FLOOR = 0.88
+# Share of the content height that scales with the line spread; the rest is
+# fixed vspace, rules and section headings.
+SCALABLE_FRACTION = 0.8
+# Aim slightly below the page budget so rounding and page breaks don't spill.
+FIT_SAFETY = 0.97
+# Rough characters per rendered bullet line, used to cost a bullet in lines.
+CHARS_PER_LINE = 95
+# Keys holding bullet lists in the template schemas.
+BULLET_KEYS = ("details", "bullets", "tasks", "points", "notes")
+MIN_BULLETS_KEPT = 1
+
+_FIT_MARKER = "FITINFO"
+_FIT_RE = re.compile(
+    _FIT_MARKER + r":p=(\d+);t=([\d.]+)pt;h=([\d.]+)pt;b=([\d.]+)pt"
+)
+_OUTPUT_RE = re.compile(r"Output written on \S+ \((\d+) pages?")
+_SETSTRETCH_RE = re.compile(r"\\setstretch\{([\d.]+)\}")
+
+# ------------ Instrumentation ------------
+
+def instrument(tex_source: str, linespread: float = 1.0) -> str:
+    """
+    Add a layout probe before \\end{document} and, when linespread != 1,
+    scale the template's line spread. The probe only writes to the log,
+    so the resulting PDF is identical to an uninstrumented build.
+    """
+    probe = (
+        "\\typeout{" + _FIT_MARKER + ":p=\\the\\value{page};"
+        "t=\\the\\pagetotal;h=\\the\\textheight;"
+        "b=\\the\\dimexpr\\baselineskip\\relax}\n"
+    )
+    end = tex_source.rfind("\\end{document}")
+    if end == -1:
+        return tex_source
+    tex_source = tex_source[:end] + probe + tex_source[end:]
+
+    if linespread != 1.0:
+        m = _SETSTRETCH_RE.search(tex_source)
+        base = float(m.group(1)) if m else 1.0
+        # Registered last, so it runs after setspace and friends at \begin{document}
+        hook = f"\\AtBeginDocument{{\\linespread{{{base * linespread:.4f}}}\\selectfont}}\n"
+        begin = tex_source.find("\\begin{document}")
+        if begin != -1:
+            tex_source = tex_source[:begin] + hook + tex_source[begin:]
+    return tex_source
+
+def parse_layout(log_text: str) -> Optional[Dict[str, float]]:
+    """Extract page count and last-page fill from an instrumented compile log."""
+    m = _FIT_RE.search(log_text or "")
+    if not m:
+        return None
+    layout = {
+        "pages": int(m.group(1)),
+        "pagetotal": float(m.group(2)),
+        "textheight": float(m.group(3)),
+        "baselineskip": float(m.group(4)),
+    }
+    # pdfTeX's own summary is authoritative (e.g. when the last page is empty)
+    out = _OUTPUT_RE.search(log_text)
+    if out:
+        layout["pages"] = int(out.group(1))
+    return layout
+
+def parse_page_count(log_text: str) -> Optional[int]:
+    """Page count from pdfTeX's "Output written on" summary, if present."""
+    m = _OUTPUT_RE.search(log_text or "")
+    return int(m.group(1)) if m else None
+
+def content_height(layout: Dict[str, float]) -> float:
+    """Approximate total content height in pt across all pages."""
+    return (layout["pages"] - 1) * layout["textheight"] + layout["pagetotal"]
+
+# ------------ Planning ------------
+
+def plan_linespread(layout: Dict[str, float], max_pages: int, current: float = 1.0) -> float:
+    """
+    Line spread (relative to the template default) expected to bring the
+    measured content within max_pages. May be below LINESPREAD_FLOOR.
+    """
+    height = content_height(layout)
+    if height <= 0:
+        return current
+    ratio = (max_pages * layout["textheight"] * FIT_SAFETY) / height
+    return current * (1 - (1 - ratio) / SCALABLE_FRACTION)
+
+def overflow_lines(layout: Dict[str, float], max_pages: int, current: float, target: float) -> int:
+    """Lines that still overflow after moving the line spread from current to target."""
+    height = content_height(layout)
+    shrunk = height * (1 - SCALABLE_FRACTION + SCALABLE_FRACTION * target / current)
+    excess = shrunk - max_pages * layout["textheight"] * FIT_SAFETY
+    if excess <= 0:
+        return 0
+    line = layout["baselineskip"] * target / current
+    return math.ceil(excess / line) if line > 0 else 0
+
+def _bullet_lines(text: Any) -> int:
+    return max(1, math.ceil(len(str(text)) / CHARS_PER_LINE))
+
+def trim_bullets(structured: Dict[str, Any], lines: int) -> Tuple[Dict[str, Any], int]:
+    """
+    Drop trailing bullets until roughly `lines` rendered lines are freed.
+    Always trims the longest list first (later entries win ties, as they are
+    usually older roles) and keeps MIN_BULLETS_KEPT per entry.
+    Returns (trimmed copy, number of bullets removed).
+    """
+    data = copy.deepcopy(structured)
+    lists = []
+    for value in data.values():
+        if not isinstance(value, list):
+            continue
+        for entry in value:
+            if not isinstance(entry, dict):
+                continue
+            for key in BULLET_KEYS:
+                bullets = entry.get(key)
+                if isinstance(bullets, list):
+                    lists.append(bullets)
+
+    removed = 0
+    freed = 0
+    while freed < lines:
+        candidates = [b for b in lists if len(b) > MIN_BULLETS_KEPT]
+        if not candidates:
+            break
+        longest = max(len(b) for b in candidates)
+        target = [b for b in candidates if len(b) == longest][-1]
+        freed += _bullet_lines(target.pop())
+        removed += 1
+    return data, removed
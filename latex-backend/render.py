@@ -1,48 +1,421 @@
-import os, tempfile, subprocess, shutil, requests, json
+import os, tempfile, subprocess, shutil, requests, json, hashlib, threading, atexit, uuid, zipfile, math
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import HTTPException
 from jinja2 import Environment, BaseLoader, select_autoescape, FileSystemLoader
-from llm_cleaner import clean_resume_with_llm
+from llm_cleaner import clean_resume_with_llm, OPENROUTER_ENDPOINT
 from llm_template_preserver import make_jinja_clone_from_template
-from schema import SCHEMA_HINT
+from schema import SCHEMA_HINT, CANONICAL_SCHEMA
+from template_mapping import map_canonical_to_template
+import page_fit
+from latex_safety import escape_latex, escape_tree, validate_tex
 
-def escape_latex(s: str) -> str:
-    if not s:
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+TEMPLATE_MAP = {
+    "simple": "simple.tex.j2",
+    "classic": "classic.tex.j2",
+    "modern": "modern.tex.j2",
+    "research": "research.tex.j2",
+}
+CLEANER_MODEL = "mistralai/mistral-7b-instruct"
+# Instrumented passes when fitting to a page limit (measure, then one corrected
+# pass); a final settle pass makes at most MAX_FIT_COMPILES + 1 pdflatex runs
+MAX_FIT_COMPILES = 2
+# Error reports and the fit probe only need the end of the TeX log
+LOG_TAIL_LINES = 200
+LOG_TAIL_BYTES = 64 * 1024
+
+# Rendered PDFs and canonical structures are cached per (resume, job description)
+# so switching templates after a multi-template render is instant. PDF entries are
+# tagged with the structuring pass they came from (SOURCE_*), so a multi-template
+# render never mixes in a PDF tailored by the per-template pass.
+PDF_CACHE_SIZE = 64
+STRUCT_CACHE_SIZE = 32
+
+SOURCE_TEMPLATE = "template"
+SOURCE_CANONICAL = "canonical"
+
+
+def _usable_cpus() -> int:
+    """Cores this process may run on: affinity mask (cpusets), capped by a cgroup v2 CPU quota."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0)) or 1
+    else:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+# Caps concurrent pdflatex processes across all requests (single and multi-template)
+MAX_CONCURRENT_COMPILES = _usable_cpus()
+_compile_slots = threading.BoundedSemaphore(MAX_CONCURRENT_COMPILES)
+
+
+class _LRUCache:
+    """Small thread-safe LRU cache; requests are served from a threadpool."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+def _link_or_copy(src: str, dst: str):
+    # Hard links share the inode, so caching and serving move no bytes
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def _link_into_workspace(pdf_path: str) -> str:
+    workdir = tempfile.mkdtemp(prefix="latex_")
+    dst = os.path.join(workdir, "resume.pdf")
+    _link_or_copy(pdf_path, dst)
+    return dst
+
+
+class _PdfFileCache:
+    """LRU of compiled PDFs kept on disk; only paths are held in memory."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._dir = None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        atexit.register(self.clear)
+
+    def _cache_dir(self) -> str:
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp(prefix="latex_cache_")
+        return self._dir
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            if self._dir is not None:
+                shutil.rmtree(self._dir, ignore_errors=True)
+                self._dir = None
+
+    def checkout(self, key, stats=None):
+        """
+        Link the cached PDF into a fresh workspace (see release_pdf); None on a miss.
+        On a hit, `stats` gets the layout stats recorded with the entry.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+            path, layout = entry
+            if stats is not None:
+                stats.update(layout, cached=True)
+            # Under the lock, so eviction cannot unlink it first
+            return _link_into_workspace(path)
+
+    def layout(self, key):
+        """Stats recorded with an entry, without touching recency; None on a miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            return dict(entry[1]) if entry is not None else None
+
+    def put(self, key, pdf_path: str, stats=None):
+        # Compile counts describe the original build, not later cache hits
+        layout = {k: v for k, v in (stats or {}).items() if k not in ("compiles", "cached")}
+        with self._lock:
+            dst = os.path.join(self._cache_dir(), f"{uuid.uuid4().hex}.pdf")
+            _link_or_copy(pdf_path, dst)
+            old = self._data.pop(key, None)
+            self._data[key] = (dst, layout)
+            evicted = [old[0]] if old else []
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False)[1][0])
+        for path in evicted:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+_pdf_cache = _PdfFileCache(PDF_CACHE_SIZE)
+_struct_cache = _LRUCache(STRUCT_CACHE_SIZE)
+
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape([]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+_env.filters["escapelatex"] = escape_latex
+
+
+def _payload_key(resume_data: dict, job_description: str) -> str:
+    blob = json.dumps([resume_data, job_description], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _check_template_id(template_id: str):
+    if template_id not in TEMPLATE_MAP:
+        raise HTTPException(400, f"Invalid template ID: {template_id}")
+
+
+def _render_tex(template_id: str, structured: dict) -> str:
+    template = _env.get_template(TEMPLATE_MAP[template_id])
+    try:
+        # Escape the whole tree once; the escapelatex filter then passes values through
+        tex_source = template.render(**escape_tree(structured))
+    except Exception as e:
+        raise HTTPException(400, f"Template render error: {e}")
+
+    # Reject broken sources here instead of after a full pdflatex run
+    problems = validate_tex(tex_source)
+    if problems:
+        raise HTTPException(400, "Rendered LaTeX failed pre-compile check:\n" + "\n".join(problems))
+    return tex_source
+
+
+def clear_pdf_cache():
+    """Drop all cached PDFs and their cache directory (called on app shutdown)."""
+    _pdf_cache.clear()
+
+
+def release_pdf(pdf_path: str):
+    """Remove the private workspace a PDF path returned by render_pdf(s) lives in."""
+    shutil.rmtree(os.path.dirname(pdf_path), ignore_errors=True)
+
+
+def build_zip(pdfs: dict, stats=None) -> str:
+    """
+    Archive {template_id: pdf_path} as resume-<id>.pdf entries in a fresh workspace.
+    With `stats` ({template_id: stats} from render_pdfs), a manifest.json maps each
+    template to its file and render stats. The input PDFs are released; the caller
+    must release_pdf() the returned path.
+    """
+    workdir = tempfile.mkdtemp(prefix="latex_")
+    zip_path = os.path.join(workdir, "resumes.zip")
+    try:
+        # PDFs are already compressed; stored entries stream straight from disk
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zf:
+            for template_id, pdf_path in pdfs.items():
+                zf.write(pdf_path, f"resume-{template_id}.pdf")
+            if stats is not None:
+                manifest = {
+                    template_id: {"file": f"resume-{template_id}.pdf", **stats.get(template_id, {})}
+                    for template_id in pdfs
+                }
+                zf.writestr("manifest.json", json.dumps(manifest, indent=2))
+    except BaseException:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+    finally:
+        for pdf_path in pdfs.values():
+            release_pdf(pdf_path)
+    return zip_path
+
+
+def _read_log_tail(log_path: str, max_lines: int = LOG_TAIL_LINES, max_bytes: int = LOG_TAIL_BYTES) -> str:
+    """Last lines of a TeX log, read by seeking from the end instead of loading it all."""
+    try:
+        with open(log_path, "rb") as lf:
+            lf.seek(0, os.SEEK_END)
+            size = lf.tell()
+            lf.seek(max(0, size - max_bytes))
+            tail = lf.read().decode("utf-8", errors="ignore")
+    except OSError:
         return ""
-    repl = {
-        '\\': r'\textbackslash{}', '&': r'\&', '%': r'\%', '$': r'\$',
-        '#': r'\#', '_': r'\_', '{': r'\{', '}': r'\}', '~': r'\textasciitilde{}',
-        '^': r'\^{}',
-    }
-    for k, v in repl.items():
-        s = s.replace(k, v)
-    return s
+    return "\n".join(tail.splitlines()[-max_lines:])
+
+
+def _run_pdflatex(workdir: str, passes: int):
+    compile_cmd = [
+        "pdflatex",
+        "-interaction=nonstopmode",
+        "-halt-on-error",
+        "resume.tex",
+    ]
+    try:
+        # Console output is discarded: resume.log has the same content without buffering it here
+        with _compile_slots:
+            for _ in range(passes):
+                subprocess.run(compile_cmd, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, check=True)
+    except subprocess.CalledProcessError as e:
+        log_tail = _read_log_tail(os.path.join(workdir, "resume.log"))
+        raise HTTPException(400, f"LaTeX compilation failed. Last log lines:\n{log_tail}")
 
-def render_pdf(payload: dict, template_id: str = "modern"):
+
+def _compile_tex(tex_source: str, passes: int = 2, keep_log: bool = False):
+    """
+    Run pdflatex `passes` times in a fresh workspace. Returns (pdf_path, log_tail or "");
+    the caller owns the workspace and must release_pdf() it.
+    """
+    workdir = tempfile.mkdtemp(prefix="latex_")
+    try:
+        tex_path = os.path.join(workdir, "resume.tex")
+        with open(tex_path, "w", encoding="utf-8") as f:
+            f.write(tex_source)
+
+        # First pass is usually sufficient; run twice for references
+        _run_pdflatex(workdir, passes)
+
+        log_text = _read_log_tail(os.path.join(workdir, "resume.log")) if keep_log else ""
+        return os.path.join(workdir, "resume.pdf"), log_text
+    except BaseException:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+
+
+def _fit_pdf(template_id: str, structured: dict, max_pages: int, stats: dict) -> str:
+    """
+    Compile within max_pages using measured layout instead of a blind search:
+    every compile is a single instrumented pass whose log reports page count and
+    last-page fill, which drives the next line spread / bullet trim. Once the
+    layout is settled, one more pass in the same workspace resolves references
+    and hyperref outlines (e.g. classic's numbered sections) like the normal
+    two-pass build, so at most MAX_FIT_COMPILES + 1 pdflatex runs happen.
+    """
+    # Escaped once here; re-renders below pass the LatexSafe strings straight through
+    data = escape_tree(structured)
+    spread = 1.0
+    pdf_path = None
+    try:
+        for attempt in range(MAX_FIT_COMPILES):
+            tex = page_fit.instrument(_render_tex(template_id, data), spread)
+            if pdf_path:
+                release_pdf(pdf_path)
+                pdf_path = None
+            pdf_path, log_text = _compile_tex(tex, passes=1, keep_log=True)
+            stats["compiles"] += 1
+            layout = page_fit.parse_layout(log_text)
+            if layout is None:
+                break
+            stats["pages"] = layout["pages"]
+            if layout["pages"] <= max_pages or attempt == MAX_FIT_COMPILES - 1:
+                break
+
+            target = page_fit.plan_linespread(layout, max_pages, spread)
+            if target < page_fit.LINESPREAD_FLOOR:
+                target = max(page_fit.LINESPREAD_FLOOR, min(spread, target))
+                lines = page_fit.overflow_lines(layout, max_pages, spread, target)
+                data, removed = page_fit.trim_bullets(data, lines)
+                stats["trimmed_bullets"] += removed
+            spread = target
+            stats["linespread"] = round(spread, 4)
+
+        # Second pass over the settled layout; the probe only writes to the log
+        _run_pdflatex(os.path.dirname(pdf_path), 1)
+        stats["compiles"] += 1
+    except BaseException:
+        if pdf_path:
+            release_pdf(pdf_path)
+        raise
+
+    stats["fits"] = "pages" in stats and stats["pages"] <= max_pages
+    return pdf_path
+
+
+def _build_pdf(template_id: str, structured: dict, max_pages=None, stats=None) -> str:
+    stats = stats if stats is not None else {}
+    stats.setdefault("compiles", 0)
+    if max_pages:
+        stats.update(linespread=1.0, trimmed_bullets=0)
+        return _fit_pdf(template_id, structured, max_pages, stats)
+    pdf_path, log_text = _compile_tex(_render_tex(template_id, structured), keep_log=True)
+    stats["compiles"] += 2
+    pages = page_fit.parse_page_count(log_text)
+    if pages is not None:
+        stats["pages"] = pages
+    return pdf_path
+
+
+def _checkout_cached(key: str, template_id: str, max_pages, source: str, stats: dict):
+    """
+    Cached PDF for this request, or None. A page limit the unfitted build
+    already meets is served from the unfitted entry, so large or varying
+    maxPages values don't each compile and cache their own copy.
+    """
+    cached = _pdf_cache.checkout((key, template_id, max_pages, source), stats)
+    if cached is not None or not max_pages:
+        return cached
+    layout = _pdf_cache.layout((key, template_id, None, source))
+    if layout is None or layout.get("pages") is None or layout["pages"] > max_pages:
+        return None
+    cached = _pdf_cache.checkout((key, template_id, None, source), stats)
+    if cached is not None:
+        stats.update(linespread=1.0, trimmed_bullets=0, fits=True)
+    return cached
+
+
+def _put_cached(key: str, template_id: str, max_pages, source: str, pdf_path: str, stats: dict):
+    # A fit that changed nothing produced the unfitted document; store it as such
+    if max_pages and stats.get("linespread") == 1.0 and not stats.get("trimmed_bullets") and stats.get("fits"):
+        max_pages = None
+        stats = {k: v for k, v in stats.items() if k not in ("linespread", "trimmed_bullets", "fits")}
+    _pdf_cache.put((key, template_id, max_pages, source), pdf_path, stats)
+
+
+def _check_max_pages(max_pages):
+    if max_pages is not None and max_pages < 1:
+        raise HTTPException(400, f"Invalid page limit: {max_pages}")
+
+
+def render_pdf(payload: dict, template_id: str = "modern", max_pages=None, stats=None) -> str:
+    """
+    Tailor and render one template. Returns the path of the PDF inside a private
+    workspace; stream it to the client and call release_pdf() afterwards.
+    With max_pages, the layout is fitted to that many pages in at most
+    MAX_FIT_COMPILES + 1 (= 3) pdflatex runs. `stats`, if given, is filled with compiles
+    (pdflatex runs) and, when fitting, pages/linespread/trimmed_bullets/fits;
+    cache hits report cached=True and the stats recorded with the entry.
+    """
     resume_data = payload.get("resumeData", payload)
     job_description = payload.get("jobDescription", "")
+    _check_template_id(template_id)
+    _check_max_pages(max_pages)
+    stats = stats if stats is not None else {}
+    stats.setdefault("compiles", 0)
+
+    key = _payload_key(resume_data, job_description)
+    # Either pass is fine for a single template; prefer this template's own structuring
+    for source in (SOURCE_TEMPLATE, SOURCE_CANONICAL):
+        cached = _checkout_cached(key, template_id, max_pages, source, stats)
+        if cached is not None:
+            return cached
+
+    # A previous multi-template render already tailored this resume: reuse it
+    canonical = _struct_cache.get(key)
+    if canonical is not None:
+        structured = map_canonical_to_template(canonical, template_id)
+        pdf_path = _build_pdf(template_id, structured, max_pages, stats)
+        _put_cached(key, template_id, max_pages, SOURCE_CANONICAL, pdf_path, stats)
+        return pdf_path
 
     # 1) Improve content truthfully (same keys)
     try:
-        enhanced = clean_resume_with_llm(resume_data, job_description, model="mistralai/mistral-7b-instruct")
+        enhanced = clean_resume_with_llm(resume_data, job_description, model=CLEANER_MODEL)
     except Exception as e:
         raise HTTPException(500, f"LLM content cleaner failed: {e}")
 
-    # 2) Load the original, chosen template source
-    templates_dir = os.path.join(os.path.dirname(__file__), "templates")
-    template_map = {
-        "simple": "simple.tex.j2",
-        "classic": "classic.tex.j2",
-        "modern": "modern.tex.j2",
-        "research": "research.tex.j2",
-    }
-    if template_id not in template_map:
-        raise HTTPException(400, f"Invalid template ID: {template_id}")
-
-    original_path = os.path.join(templates_dir, template_map[template_id])
-    with open(original_path, "r", encoding="utf-8") as f:
-        original_source = f.read()
-
-    # 3) Build structured JSON matching the template, then render Jinja with LaTeX-escaping
+    # 2) Build structured JSON matching the template
     try:
         structured = _llm_struct_for_template(
             template_id=template_id,
@@ -52,55 +425,89 @@ def render_pdf(payload: dict, template_id: str = "modern"):
     except Exception as e:
         raise HTTPException(500, f"LLM structuring failed: {e}")
 
-    env = Environment(
-        loader=FileSystemLoader(templates_dir),
-        autoescape=select_autoescape([]),
-        trim_blocks=True,
-        lstrip_blocks=True,
-    )
-    env.filters["escapelatex"] = escape_latex
-    template = env.get_template(template_map[template_id])
-    try:
-        tex_source = template.render(**structured)
-    except Exception as e:
-        raise HTTPException(400, f"Template render error: {e}")
+    # 3) Render Jinja with LaTeX-escaping, then compile to PDF
+    pdf_path = _build_pdf(template_id, structured, max_pages, stats)
+    _put_cached(key, template_id, max_pages, SOURCE_TEMPLATE, pdf_path, stats)
+    return pdf_path
 
-    # 5) Compile to PDF
-    workdir = tempfile.mkdtemp(prefix="latex_")
+
+def render_pdfs(payload: dict, template_ids=None, max_pages=None, stats=None) -> dict:
+    """
+    Multi-template render: tailor the resume once into the canonical structure,
+    map it onto every requested template and compile them concurrently.
+    Returns {template_id: pdf_path} in the requested order; each path lives in
+    its own workspace and must be released with release_pdf(). `stats`, if given,
+    is filled with {template_id: stats} as described for render_pdf().
+    """
+    resume_data = payload.get("resumeData", payload)
+    job_description = payload.get("jobDescription", "")
+    template_ids = list(dict.fromkeys(template_ids or TEMPLATE_MAP))
+    for template_id in template_ids:
+        _check_template_id(template_id)
+    _check_max_pages(max_pages)
+
+    stats = stats if stats is not None else {}
+    for template_id in template_ids:
+        stats[template_id] = {"compiles": 0}
+
+    key = _payload_key(resume_data, job_description)
+    results = {}
     try:
-        tex_path = os.path.join(workdir, "resume.tex")
-        with open(tex_path, "w", encoding="utf-8") as f:
-            f.write(tex_source)
+        missing = []
+        for template_id in template_ids:
+            # Only canonical-built PDFs, so all templates in the set share one tailoring pass
+            cached = _checkout_cached(key, template_id, max_pages, SOURCE_CANONICAL, stats[template_id])
+            if cached is not None:
+                results[template_id] = cached
+            else:
+                missing.append(template_id)
 
-        compile_cmd = [
-            "pdflatex",
-            "-interaction=nonstopmode",
-            "-halt-on-error",
-            "resume.tex",
-        ]
-        try:
-            # First pass is usually sufficient; run twice for references
-            subprocess.run(compile_cmd, cwd=workdir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, check=True)
-            subprocess.run(compile_cmd, cwd=workdir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, check=True)
-        except subprocess.CalledProcessError as e:
-            log_path = os.path.join(workdir, "resume.log")
-            log_tail = ""
-            if os.path.exists(log_path):
+        if missing:
+            canonical = _struct_cache.get(key)
+            if canonical is None:
+                # Both LLM stages run once, regardless of how many templates are requested
                 try:
-                    with open(log_path, "r", encoding="utf-8", errors="ignore") as lf:
-                        log = lf.read()
-                        # Keep last 200 lines for brevity
-                        log_tail = "\n".join(log.splitlines()[-200:])
-                except Exception:
-                    pass
-            raise HTTPException(400, f"LaTeX compilation failed. Last log lines:\n{log_tail}")
-
-        pdf_path = os.path.join(workdir, "resume.pdf")
-        with open(pdf_path, "rb") as f:
-            return f.read()
-    finally:
-        # while debugging, you can print(workdir) and inspect files
-        shutil.rmtree(workdir, ignore_errors=True)
+                    enhanced = clean_resume_with_llm(resume_data, job_description, model=CLEANER_MODEL)
+                except Exception as e:
+                    raise HTTPException(500, f"LLM content cleaner failed: {e}")
+                try:
+                    canonical = _llm_struct_for_template(
+                        template_id="canonical",
+                        raw_text_data=enhanced,
+                        job_description=job_description,
+                    )
+                except Exception as e:
+                    raise HTTPException(500, f"LLM structuring failed: {e}")
+                _struct_cache.put(key, canonical)
+
+            # Each pdflatex run is its own process, so threads are enough to keep all cores busy;
+            # _compile_slots keeps the total across concurrent requests at the core count
+            workers = max(1, min(len(missing), MAX_CONCURRENT_COMPILES))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    template_id: pool.submit(
+                        _build_pdf, template_id, map_canonical_to_template(canonical, template_id),
+                        max_pages, stats[template_id],
+                    )
+                    for template_id in missing
+                }
+                errors = []
+                for template_id, future in futures.items():
+                    try:
+                        pdf_path = future.result()
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+                    _put_cached(key, template_id, max_pages, SOURCE_CANONICAL, pdf_path, stats[template_id])
+                    results[template_id] = pdf_path
+                if errors:
+                    raise errors[0]
+    except BaseException:
+        for pdf_path in results.values():
+            release_pdf(pdf_path)
+        raise
+
+    return {template_id: results[template_id] for template_id in template_ids}
 
 
 def _llm_fill_template_with_data(template_source: str, filled_data: dict, job_description: str) -> str:
@@ -151,7 +558,7 @@ def _llm_fill_template_with_data(template_source: str, filled_data: dict, job_de
         "temperature": 0.2,
     }
 
-    r = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=body, timeout=90)
+    r = requests.post(OPENROUTER_ENDPOINT, headers=headers, json=body, timeout=90)
     if r.status_code != 200:
         raise RuntimeError(f"OpenRouter error {r.status_code}: {r.text}")
 
@@ -356,6 +763,9 @@ def _llm_struct_for_template(template_id: str, raw_text_data: dict, job_descript
             ],
             "certifications": ["string"]
         }
+    elif template_id == "canonical":
+        # Template-neutral superset used by multi-template rendering
+        schema_hint = CANONICAL_SCHEMA
     else:
         # Fallback to generic schema
         schema_hint = SCHEMA_HINT
@@ -390,7 +800,7 @@ def _llm_struct_for_template(template_id: str, raw_text_data: dict, job_descript
         "response_format": {"type": "json_object"}
     }
 
-    r = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=body, timeout=90)
+    r = requests.post(OPENROUTER_ENDPOINT, headers=headers, json=body, timeout=90)
     if r.status_code != 200:
         raise RuntimeError(f"OpenRouter error {r.status_code}: {r.text}")
 
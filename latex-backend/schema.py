@@ -12,3 +12,55 @@ projects: [
 education: [ { degree: string, school: string, year: string } ]
 certifications: [string]
 """
+
+# Template-neutral structure produced once per resume and mapped onto each
+# template schema by template_mapping.py (multi-template rendering).
+CANONICAL_SCHEMA = {
+    "name": "string",
+    "email": "string",
+    "phone": "string",
+    "website": "string (optional, URL)",
+    "linkedin": "string (optional, URL)",
+    "github": "string (optional, URL)",
+    "headline": "string (optional; e.g., Software Engineer)",
+    "summary": "string (optional)",
+    "education": [
+        {
+            "school": "string",
+            "location": "string",
+            "degree": "string",
+            "dates": "string",
+            "notes": ["string"]
+        }
+    ],
+    "experience": [
+        {
+            "title": "string",
+            "company": "string",
+            "location": "string",
+            "dates": "string (e.g., 2021 -- Present)",
+            "details": ["string"]
+        }
+    ],
+    "projects": [
+        {
+            "name": "string",
+            "sponsor": "string (optional)",
+            "dates": "string (optional)",
+            "stack": "string (optional; comma separated)",
+            "details": ["string"]
+        }
+    ],
+    "awards": [
+        {"title": "string", "detail": "string (optional)", "date": "string (optional)"}
+    ],
+    "skills": [
+        {"category": "string", "items": "string (comma separated)"}
+    ],
+    "services": [
+        {"label": "string", "detail": "string"}
+    ],
+    "certifications": [
+        {"name": "string", "issuer": "string (optional)", "dates": "string (optional)"}
+    ]
+}
@@ -0,0 +1,273 @@
+# latex-backend/template_mapping.py
+
+import re
+from typing import Dict, Any, List, Callable
+
+# ------------ Helpers ------------
+
+_DATE_RANGE_SPLIT = re.compile(r"\s*(?:--|–|—|\bto\b|\s-\s)\s*", flags=re.I)
+
+def _s(v: Any) -> str:
+    """Coerce a scalar to a stripped string (None -> "")."""
+    if v is None:
+        return ""
+    return str(v).strip()
+
+def _items(v: Any) -> List[Dict[str, Any]]:
+    """Keep only dict entries of a list; the LLM occasionally mixes in strings."""
+    if not isinstance(v, list):
+        return []
+    return [x for x in v if isinstance(x, dict)]
+
+def _lines(v: Any) -> List[str]:
+    """Normalize a bullet list (list or newline separated string) to non-empty strings."""
+    if isinstance(v, str):
+        v = v.splitlines()
+    if not isinstance(v, list):
+        return []
+    return [_s(x) for x in v if _s(x)]
+
+def _split_dates(dates: str):
+    """Split "2019 -- 2021" style ranges into (start, end)."""
+    parts = _DATE_RANGE_SPLIT.split(_s(dates), maxsplit=1)
+    if len(parts) == 2:
+        return parts[0], parts[1]
+    return _s(dates), ""
+
+def _role_at(title: str, company: str) -> str:
+    return " — ".join(p for p in (_s(title), _s(company)) if p)
+
+# ------------ Per-template mappers ------------
+
+def _to_classic(c: Dict[str, Any]) -> Dict[str, Any]:
+    buckets = {"languages": [], "frameworks": [], "libraries": [], "tools": []}
+    for sk in _items(c.get("skills")):
+        category = _s(sk.get("category")).lower()
+        items = _s(sk.get("items"))
+        if not items:
+            continue
+        if "language" in category:
+            buckets["languages"].append(items)
+        elif "framework" in category:
+            buckets["frameworks"].append(items)
+        elif "librar" in category:
+            buckets["libraries"].append(items)
+        else:
+            buckets["tools"].append(items)
+
+    return {
+        "name": _s(c.get("name")),
+        "email": _s(c.get("email")),
+        "phone": _s(c.get("phone")),
+        "linkedin": _s(c.get("linkedin")),
+        "github": _s(c.get("github")),
+        "education": [
+            {
+                "school": _s(e.get("school")),
+                "location": _s(e.get("location")),
+                "degree": _s(e.get("degree")),
+                "dates": _s(e.get("dates")),
+            }
+            for e in _items(c.get("education"))
+        ],
+        "experience": [
+            {
+                "title": _s(x.get("title")),
+                "company": _s(x.get("company")),
+                "location": _s(x.get("location")),
+                "dates": _s(x.get("dates")),
+                "details": _lines(x.get("details")),
+            }
+            for x in _items(c.get("experience"))
+        ],
+        "projects": [
+            {
+                "name": _s(p.get("name")),
+                "dates": _s(p.get("dates")),
+                "stack": _s(p.get("stack")),
+                "details": _lines(p.get("details")),
+            }
+            for p in _items(c.get("projects"))
+        ],
+        "skills": {k: ", ".join(v) for k, v in buckets.items()},
+        "certifications": [
+            {
+                "name": _s(cert.get("name")),
+                "issuer": _s(cert.get("issuer")),
+                "dates": _s(cert.get("dates")),
+            }
+            for cert in _items(c.get("certifications"))
+        ],
+    }
+
+def _to_modern(c: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": _s(c.get("name")),
+        "email": _s(c.get("email")),
+        "phone": _s(c.get("phone")),
+        "website": _s(c.get("website")),
+        "identity": _s(c.get("headline")),
+        "education": [
+            {
+                "school": _s(e.get("school")),
+                "location": _s(e.get("location")),
+                "degree": _s(e.get("degree")),
+                "duration": _s(e.get("dates")),
+                "notes": _lines(e.get("notes")),
+            }
+            for e in _items(c.get("education"))
+        ],
+        "projects": [
+            {
+                "title": _s(p.get("name")),
+                "sponsor": _s(p.get("sponsor")),
+                "dates": _s(p.get("dates")),
+                "stack": _s(p.get("stack")),
+                "details": _lines(p.get("details")),
+            }
+            for p in _items(c.get("projects"))
+        ],
+        # modern has no dedicated experience section; internships is the closest fit
+        "internships": [
+            {
+                "company": _role_at(x.get("title"), x.get("company")),
+                "location": _s(x.get("location")),
+                "duration": _s(x.get("dates")),
+                "tasks": _lines(x.get("details")),
+            }
+            for x in _items(c.get("experience"))
+        ],
+        "awards": [
+            {
+                "title": _s(a.get("title")),
+                "source": _s(a.get("detail")),
+                "date": _s(a.get("date")),
+            }
+            for a in _items(c.get("awards"))
+        ],
+        "skills": [
+            {"category": _s(sk.get("category")), "items": _s(sk.get("items"))}
+            for sk in _items(c.get("skills"))
+        ],
+    }
+
+def _to_research(c: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": _s(c.get("name")),
+        "email": _s(c.get("email")),
+        "phone": _s(c.get("phone")),
+        "website": _s(c.get("website")),
+        "degree": _s(c.get("headline")),
+        "education": [
+            {
+                "institution": _s(e.get("school")),
+                "location": _s(e.get("location")),
+                "degree": _s(e.get("degree")),
+                "duration": _s(e.get("dates")),
+                "notes": _lines(e.get("notes")),
+            }
+            for e in _items(c.get("education"))
+        ],
+        "projects": [
+            {
+                "title": _s(p.get("name")),
+                "sponsor": _s(p.get("sponsor")),
+                "period": _s(p.get("dates")),
+                "details": _lines(p.get("details")),
+            }
+            for p in _items(c.get("projects"))
+        ],
+        "internships": [
+            {
+                "company": _role_at(x.get("title"), x.get("company")),
+                "location": _s(x.get("location")),
+                "duration": _s(x.get("dates")),
+                "points": _lines(x.get("details")),
+            }
+            for x in _items(c.get("experience"))
+        ],
+        "awards": [
+            {
+                "title": _s(a.get("title")),
+                "detail": _s(a.get("detail")),
+                "date": _s(a.get("date")),
+            }
+            for a in _items(c.get("awards"))
+        ],
+        "skills": [
+            {"name": _s(sk.get("category")), "tools": _s(sk.get("items"))}
+            for sk in _items(c.get("skills"))
+        ],
+        "services": [
+            {"label": _s(sv.get("label")), "detail": _s(sv.get("detail"))}
+            for sv in _items(c.get("services"))
+        ],
+    }
+
+def _to_simple(c: Dict[str, Any]) -> Dict[str, Any]:
+    experience = []
+    for x in _items(c.get("experience")):
+        start, end = _split_dates(x.get("dates"))
+        experience.append({
+            "role": _s(x.get("title")),
+            "company": _s(x.get("company")),
+            "location": _s(x.get("location")),
+            "start": start,
+            "end": end,
+            "bullets": _lines(x.get("details")),
+        })
+
+    certifications = []
+    for cert in _items(c.get("certifications")):
+        label = _s(cert.get("name"))
+        extra = ", ".join(p for p in (_s(cert.get("issuer")), _s(cert.get("dates"))) if p)
+        if label:
+            certifications.append(f"{label} ({extra})" if extra else label)
+
+    return {
+        "name": _s(c.get("name")),
+        "email": _s(c.get("email")),
+        "phone": _s(c.get("phone")),
+        "summary": _s(c.get("summary")),
+        "skills": [
+            f"{_s(sk.get('category'))}: {_s(sk.get('items'))}" if _s(sk.get("category")) else _s(sk.get("items"))
+            for sk in _items(c.get("skills"))
+            if _s(sk.get("items"))
+        ],
+        "experience": experience,
+        "projects": [
+            {
+                "name": _s(p.get("name")),
+                "tech": [t.strip() for t in _s(p.get("stack")).split(",") if t.strip()],
+                "bullets": _lines(p.get("details")),
+            }
+            for p in _items(c.get("projects"))
+        ],
+        "education": [
+            {
+                "degree": _s(e.get("degree")),
+                "school": _s(e.get("school")),
+                "year": _s(e.get("dates")),
+            }
+            for e in _items(c.get("education"))
+        ],
+        "certifications": certifications,
+    }
+
+_MAPPERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "classic": _to_classic,
+    "modern": _to_modern,
+    "research": _to_research,
+    "simple": _to_simple,
+}
+
+# ------------ Public API ------------
+
+def map_canonical_to_template(canonical: Dict[str, Any], template_id: str) -> Dict[str, Any]:
+    """
+    Deterministically reshape the canonical (template-neutral) resume structure
+    into the keys the given template expects. No LLM call involved.
+    """
+    if template_id not in _MAPPERS:
+        raise ValueError(f"No canonical mapping for template: {template_id}")
+    return _MAPPERS[template_id](canonical)
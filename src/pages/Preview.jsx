@@ -160,6 +160,42 @@ export default function Preview() {
     }
   }
 
+  // Render every template from a single tailoring pass; also warms the backend
+  // cache so switching templates afterwards is instant.
+  async function generateAllPdfs() {
+    const resumeData = JSON.parse(localStorage.getItem("resumeData") || "{}");
+    const jobDescription = localStorage.getItem("jobDescription") || "";
+
+    try {
+      const res = await fetch("http://localhost:8000/render/multi", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ resumeData, jobDescription }),
+      });
+
+      if (!res.ok) {
+        const errorText = await res.text();
+        console.error("Multi-template generation failed:", errorText);
+        alert(`PDF generation failed: ${errorText}`);
+        return;
+      }
+
+      const blob = await res.blob();
+      const url = window.URL.createObjectURL(blob);
+      const a = document.createElement("a");
+      a.href = url;
+      a.download = `resumes-all-templates-${new Date().toISOString().split('T')[0]}.zip`;
+      a.style.display = 'none';
+      document.body.appendChild(a);
+      a.click();
+      document.body.removeChild(a);
+      window.URL.revokeObjectURL(url);
+    } catch (error) {
+      console.error("Network error:", error);
+      alert(`Network error: ${error.message}`);
+    }
+  }
+
   const getScoreColor = (score) => {
     if (score >= 80) return "text-green-600";
     if (score >= 60) return "text-yellow-600";
@@ -362,6 +398,13 @@ export default function Preview() {
               >
                 {ready ? "Generate Resume PDF" : "Complete All Steps First"}
               </button>
+              <button
+                className="w-full mt-3 py-3 px-6 rounded-xl font-semibold bg-white border border-gray-300 text-gray-700 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed transition-colors"
+                onClick={generateAllPdfs}
+                disabled={!ready}
+              >
+                Generate All Templates (.zip)
+              </button>
               
               {!ready && (
                 <p className="text-xs text-yellow-600 mt-2 text-center">